@@ -2,29 +2,333 @@
 Property Search MCP Server (using Melo API) - Real Estate Search API
 """
 
-import json
+import asyncio
+import copy
+import functools
+import hashlib
 import logging
-from typing import Literal, Optional
+import os
+import re
+import sys
+from typing import Annotated, Literal, Optional
+from urllib.parse import urlencode
 
 import httpx
+import orjson
 from fastmcp import FastMCP
-from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.dependencies import get_http_request
 from pydantic import Field
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+# Logging is configured when the server starts, so importing this module
+# has no side effects on the root logger
+_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 logger = logging.getLogger("melo-mcp")
 
+# Separators framing the request/response log blocks
+_SEP = "=" * 80
+_SUB_SEP = "-" * 80
+
 # API Configuration
 MELO_API_BASE_URL = "https://api.notif.immo"
 
+# Largest Melo API response body accepted, in bytes
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+
+# Expected shape of a Melo API key, checked before any request is made
+_API_KEY_RE = re.compile(r"\A[A-Za-z0-9_\-]{16,128}\Z")
+
+# Locates the result count in a raw Melo API response body
+_TOTAL_ITEMS_RE = re.compile(rb'"hydra:totalItems"\s*:\s*(\d+)')
+
+# Melo API status codes returned for a missing or invalid API key
+_AUTH_STATUSES = frozenset((401, 403))
+
+# Headers sent with every Melo API request; the API key is added per call.
+# Compressed responses are decoded transparently by httpx.
+_BASE_HEADERS = {"Content-Type": "application/json", "Accept-Encoding": "br, gzip"}
+
+# Melo API names of the numeric filters, in the same order as the filter
+# arguments of _search_melo_properties
+_FILTER_PARAMS = (
+    "propertyTypes[]",
+    "transactionType",
+    "budgetMin",
+    "budgetMax",
+    "surfaceMin",
+    "surfaceMax",
+    "pricePerMeterMin",
+    "pricePerMeterMax",
+    "bedroomMin",
+)
+
+# User-friendly property and transaction types mapped to Melo API values
+_PROPERTY_TYPES = {"apartment": 0, "house": 1}
+_TRANSACTION_TYPES = {"sell": 0, "rent": 1}
+
+# Ordering criteria mapped to their Melo API query parameter
+_ORDER_PARAMS = {
+    "pricePerMeter": ("order[pricePerMeter]", "asc"),
+    "price": ("order[price]", "asc"),
+    "updatedAt": ("order[updatedAt]", "desc"),
+}
+
+# Cache Configuration (response caching is enabled when REDIS_URL is set)
+REDIS_URL = os.environ.get("REDIS_URL")
+CACHE_TTL_SECONDS = 60
+
 # No authentication on the MCP server - relies on pass-through
 mcp = FastMCP("Real Estate Search", stateless_http=True)
 
-logger.info("🔓 MCP Server initialized (pass-through authentication)")
+# Shared HTTP/2 clients, one per event loop, so that connections to the Melo
+# API are pooled and kept alive between tool calls, concurrent tool calls are
+# multiplexed over a single connection, and no client is ever used from a
+# loop other than the one it was created on
+_HTTP_CLIENTS: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+# Shared Redis clients used to cache Melo API responses, one per event loop
+# for the same reason as the HTTP clients
+_REDIS_CLIENTS: dict[asyncio.AbstractEventLoop, Redis] = {}
+
+# Per-loop tasks that close the loop's clients when the loop shuts down
+_LOOP_CLOSERS: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the running event loop's Melo API client, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=MELO_API_BASE_URL,
+            headers=_BASE_HEADERS,
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=30.0,
+            ),
+        )
+        _HTTP_CLIENTS[loop] = client
+        _watch_loop_shutdown(loop)
+    return client
+
+
+def _get_redis_client() -> Optional[Redis]:
+    """Return the running event loop's Redis client, or None if caching is disabled."""
+    if not REDIS_URL:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _REDIS_CLIENTS.get(loop)
+    if client is None:
+        client = Redis.from_url(REDIS_URL)
+        _REDIS_CLIENTS[loop] = client
+        _watch_loop_shutdown(loop)
+    return client
+
+
+def _watch_loop_shutdown(loop: asyncio.AbstractEventLoop) -> None:
+    """Make sure the loop's clients get closed when the loop shuts down."""
+    if loop not in _LOOP_CLOSERS:
+        _LOOP_CLOSERS[loop] = loop.create_task(_close_clients_on_shutdown(loop))
+
+
+async def _close_clients_on_shutdown(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Wait until the loop shuts down, then close its clients.
+
+    asyncio.run() and uvloop.run() cancel all pending tasks before closing the
+    loop, which is what ends the wait here.
+    """
+    try:
+        await loop.create_future()
+    finally:
+        await _close_loop_clients(loop)
+
+
+async def _close_loop_clients(loop: asyncio.AbstractEventLoop) -> None:
+    """Close and forget the clients created for the given event loop."""
+    _LOOP_CLOSERS.pop(loop, None)
+    http_client = _HTTP_CLIENTS.pop(loop, None)
+    redis_client = _REDIS_CLIENTS.pop(loop, None)
+    if http_client is not None:
+        await http_client.aclose()
+    if redis_client is not None:
+        await redis_client.aclose()
+
+
+async def _close_clients() -> None:
+    """Close the running event loop's Melo API and Redis clients, if created."""
+    await _close_loop_clients(asyncio.get_running_loop())
+
+
+# Melo API requests currently in progress, by request key
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+def _get_api_key() -> Optional[str]:
+    """Return the X-API-KEY header of the current HTTP request, if any."""
+    try:
+        return get_http_request().headers.get("x-api-key")
+    except RuntimeError:
+        return None
+
+
+def _require_api_key() -> str:
+    """Return the validated Melo API key of the current request, or raise."""
+    api_key = _get_api_key()
+
+    if not api_key:
+        logger.error("❌ Missing X-API-KEY header")
+        raise ValueError("Missing X-API-KEY header. Please provide your Melo API key.")
+    if not _API_KEY_RE.match(api_key):
+        logger.error("❌ Malformed X-API-KEY header")
+        raise ValueError("Malformed X-API-KEY header. Please check your Melo API key.")
+
+    logger.info("🔑 Using API key from request headers")
+    return api_key
+
+
+@functools.lru_cache(maxsize=256)
+def _api_key_hash(api_key: str) -> bytes:
+    """Return a short digest identifying an API key without storing it."""
+    return hashlib.blake2b(api_key.encode(), digest_size=8).digest()
+
+
+def _request_key(
+    api_key: str, params: list[tuple[str, str]], count_only: bool = False
+) -> str:
+    """
+    Build the key identifying a Melo API request in the cache and in-flight map.
+
+    The API key is hashed so that raw credentials are never stored in Redis,
+    while still keeping cached responses separate between API keys.
+    Count-only requests get their own keys, since they share their query
+    params with regular single-item requests.
+    """
+    key_params = sorted(params)
+    if count_only:
+        key_params.append(("countOnly", "true"))
+    digest = hashlib.blake2b(
+        repr(key_params).encode() + _api_key_hash(api_key), digest_size=16
+    ).hexdigest()
+    return f"melo:{digest}"
+
+
+def _response_too_large() -> ValueError:
+    """Log and build the error raised for responses over MAX_RESPONSE_BYTES."""
+    logger.error("❌ Melo API response too large")
+    return ValueError(
+        f"Melo API response exceeds {MAX_RESPONSE_BYTES} bytes. "
+        "Please narrow your search or request fewer items per page."
+    )
+
+
+async def _read_response_body(response: httpx.Response) -> bytearray:
+    """Read a streamed response body, refusing anything over MAX_RESPONSE_BYTES."""
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > MAX_RESPONSE_BYTES:
+            raise _response_too_large()
+    return body
+
+
+async def _read_total_items(response: httpx.Response) -> Optional[int]:
+    """
+    Read a streamed response only until its hydra:totalItems count is found.
+
+    Falls back to parsing the whole body if the count cannot be found by scanning.
+    """
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        # Rescan the tail of the previous chunk in case the key straddles chunks
+        start = max(len(body) - 64, 0)
+        body += chunk
+        match = _TOTAL_ITEMS_RE.search(body, start)
+        # Digits at the very end of the buffer may continue in the next chunk
+        if match and match.end() < len(body):
+            return int(match.group(1))
+        if len(body) > MAX_RESPONSE_BYTES:
+            raise _response_too_large()
+
+    match = _TOTAL_ITEMS_RE.search(body)
+    if match:
+        return int(match.group(1))
+    data = orjson.loads(body)
+    return data.get("hydra:totalItems") if isinstance(data, dict) else None
+
+
+@functools.lru_cache(maxsize=128)
+def _pagination_params(items_per_page: int, page: int) -> tuple[tuple[str, str], ...]:
+    """Return the trailing query parameters shared by every Melo API request."""
+    return (
+        ("itemsPerPage", str(items_per_page)),
+        ("page", str(page)),
+        ("withCoherentPrice", "true"),
+    )
+
+
+def _finish_inflight(request_key: str, task: asyncio.Task) -> None:
+    """Drop a finished request from _INFLIGHT and mark its outcome as retrieved."""
+    _INFLIGHT.pop(request_key, None)
+    # Every caller may have been cancelled, leaving the error otherwise unread
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch_melo_properties(
+    path: str,
+    params: list[tuple[str, str]],
+    headers: dict[str, str],
+    count_only: bool,
+    cache: Optional[Redis],
+    request_key: str,
+) -> dict:
+    """Call the Melo API, then log and cache its response."""
+    async with _get_http_client().stream(
+        "GET", f"{path}?{urlencode(params)}", headers=headers
+    ) as response:
+        status_code = response.status_code
+        if not 200 <= status_code < 300:
+            if status_code in _AUTH_STATUSES:
+                logger.error("❌ Invalid Melo API key")
+                raise ValueError("Invalid Melo API key. Please check your credentials.")
+            response.raise_for_status()
+        if count_only:
+            # Count-only request: skip parsing the rest of the body
+            total_items = await _read_total_items(response)
+            response_data = {"hydra:totalItems": total_items}
+        else:
+            body = await _read_response_body(response)
+            response_data = orjson.loads(body)
+
+    # Log response details
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(_SUB_SEP)
+        logger.info("✅ Melo API Response")
+        logger.info("Status Code: %s", response.status_code)
+        logger.info("HTTP Version: %s", response.http_version)
+        logger.info("Total Items: %s", response_data.get("hydra:totalItems", "N/A"))
+        logger.info(
+            "Properties Returned: %d", len(response_data.get("hydra:member", []))
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            preview = orjson.dumps(response_data)[:500]
+            logger.debug("Response Preview: %s...", preview.decode("utf-8", "replace"))
+        logger.info(_SEP)
+
+    if cache is not None:
+        try:
+            await cache.set(
+                request_key, orjson.dumps(response_data), ex=CACHE_TTL_SECONDS
+            )
+        except RedisError as e:
+            logger.warning("⚠️ Cache store failed: %s", e)
+
+    return response_data
 
 
 async def _search_melo_properties(
@@ -42,6 +346,7 @@ async def _search_melo_properties(
     order_by: Optional[str] = None,
     items_per_page: int = 10,
     page: int = 1,
+    cache_bypass: bool = False,
 ) -> dict:
     """
     Internal function to call the Melo API using the provided API key.
@@ -58,92 +363,160 @@ async def _search_melo_properties(
         bedroom_min: Minimum number of bedrooms
         included_zipcodes: List of zip codes to search in
         order_by: Ordering criteria (pricePerMeter, price, updatedAt)
-        items_per_page: Number of results per page (max 30)
+        items_per_page: Number of results per page (max 30), or 0 to only fetch the total count
         page: Page number for pagination
+        cache_bypass: Skip the response cache lookup and always query the API
 
     Returns:
         API response as a dictionary
     """
-    url = f"{MELO_API_BASE_URL}/documents/properties"
+    path = "/documents/properties"
 
     # Build query parameters, filtering out None values
     # Using list of tuples to support multiple values for same key (zip codes)
-    params = []
-
-    if property_type is not None:
-        params.append(("propertyTypes[]", str(property_type)))
-    if transaction_type is not None:
-        params.append(("transactionType", str(transaction_type)))
-    if budget_min is not None:
-        params.append(("budgetMin", str(budget_min)))
-    if budget_max is not None:
-        params.append(("budgetMax", str(budget_max)))
-    if surface_min is not None:
-        params.append(("surfaceMin", str(surface_min)))
-    if surface_max is not None:
-        params.append(("surfaceMax", str(surface_max)))
-    if price_per_meter_min is not None:
-        params.append(("pricePerMeterMin", str(price_per_meter_min)))
-    if price_per_meter_max is not None:
-        params.append(("pricePerMeterMax", str(price_per_meter_max)))
-    if bedroom_min is not None:
-        params.append(("bedroomMin", str(bedroom_min)))
+    filters = (
+        property_type,
+        transaction_type,
+        budget_min,
+        budget_max,
+        surface_min,
+        surface_max,
+        price_per_meter_min,
+        price_per_meter_max,
+        bedroom_min,
+    )
+    params = [
+        (name, str(value))
+        for name, value in zip(_FILTER_PARAMS, filters)
+        if value is not None
+    ]
 
+    # A sized list (unlike a generator) lets extend() grow params in one resize
     if included_zipcodes:
-        for zipcode in included_zipcodes:
-            params.append(("includedZipcodes[]", zipcode))
+        params.extend(
+            [("includedZipcodes[]", zipcode) for zipcode in included_zipcodes]
+        )
 
     # Handle ordering
-    if order_by:
-        if order_by == "pricePerMeter":
-            params.append(("order[pricePerMeter]", "asc"))
-        elif order_by == "price":
-            params.append(("order[price]", "asc"))
-        elif order_by == "updatedAt":
-            params.append(("order[updatedAt]", "desc"))
-
-    params.append(("itemsPerPage", str(items_per_page)))
-    params.append(("page", str(page)))
-    params.append(("withCoherentPrice", "true"))
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-API-KEY": api_key,
-    }
+    if order_by in _ORDER_PARAMS:
+        params.append(_ORDER_PARAMS[order_by])
+
+    # Count-only requests fetch the smallest page the API serves and keep
+    # nothing but the total from it
+    count_only = items_per_page == 0
+    params.extend(_pagination_params(1 if count_only else items_per_page, page))
+
+    headers = {"X-API-KEY": api_key}
 
     # Log request details
-    logger.info("=" * 80)
+    logger.info(_SEP)
     logger.info("🔍 Melo API Request")
-    logger.info(f"URL: {url}")
-    logger.info("Parameters:")
-    for key, value in params:
-        logger.info(f"  {key}: {value}")
+    logger.info("URL: %s%s", MELO_API_BASE_URL, path)
+    logger.info("Params: %s", params)
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    request_key = _request_key(api_key, params, count_only)
+    cache = _get_redis_client()
+    if cache is not None and not cache_bypass:
         try:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            response_data = response.json()
-
-            # Log response details
-            logger.info("-" * 80)
-            logger.info("✅ Melo API Response")
-            logger.info(f"Status Code: {response.status_code}")
-            logger.info(f"Total Items: {response_data.get('hydra:totalItems', 'N/A')}")
-            logger.info(
-                f"Properties Returned: {len(response_data.get('hydra:member', []))}"
-            )
-            logger.info(
-                f"Response Preview: {json.dumps(response_data, indent=2)[:500]}..."
+            cached = await cache.get(request_key)
+        except RedisError as e:
+            logger.warning("⚠️ Cache lookup failed: %s", e)
+            cached = None
+        if cached is not None:
+            logger.info("⚡ Melo API Response served from cache")
+            logger.info(_SEP)
+            return orjson.loads(cached)
+
+    # Share a single upstream call between concurrent identical requests
+    task = _INFLIGHT.get(request_key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _fetch_melo_properties(
+                path, params, headers, count_only, cache, request_key
             )
-            logger.info("=" * 80)
+        )
+        _INFLIGHT[request_key] = task
+        task.add_done_callback(functools.partial(_finish_inflight, request_key))
+        # Shielded so that a cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
 
-            return response_data
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code in [401, 403]:
-                logger.error("❌ Invalid Melo API key")
-                raise ValueError("Invalid Melo API key. Please check your credentials.")
-            raise
+    logger.info("🔗 Joining identical in-flight Melo API request")
+    logger.info(_SEP)
+    # Each joining caller gets its own copy, so none can see another's changes
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+# Tool parameter types shared by search_properties and search_properties_batch
+_PropertyTypeParam = Annotated[
+    Literal["apartment", "house"],
+    Field(description="Type of property: 'apartment' or 'house'"),
+]
+_TransactionTypeParam = Annotated[
+    Literal["sell", "rent"],
+    Field(description="Transaction type: 'sell' for purchase or 'rent' for rental"),
+]
+_BudgetMinParam = Annotated[
+    Optional[int], Field(description="Minimum budget/price in euros")
+]
+_BudgetMaxParam = Annotated[
+    Optional[int], Field(description="Maximum budget/price in euros")
+]
+_SurfaceMinParam = Annotated[
+    Optional[int], Field(description="Minimum surface area in square meters")
+]
+_SurfaceMaxParam = Annotated[
+    Optional[int], Field(description="Maximum surface area in square meters")
+]
+_PricePerMeterMinParam = Annotated[
+    Optional[int], Field(description="Minimum price per square meter in euros")
+]
+_PricePerMeterMaxParam = Annotated[
+    Optional[int], Field(description="Maximum price per square meter in euros")
+]
+_BedroomMinParam = Annotated[
+    Optional[int], Field(description="Minimum number of bedrooms")
+]
+_ZipCodesParam = Annotated[
+    Optional[list[str]],
+    Field(description="List of zip codes to search in (e.g., ['75011', '23158'])"),
+]
+_OrderByParam = Annotated[
+    Optional[Literal["pricePerMeter", "price", "updatedAt"]],
+    Field(description="Sort results by: 'pricePerMeter', 'price', or 'updatedAt'"),
+]
+_CacheBypassParam = Annotated[
+    bool,
+    Field(description="Skip cached results and always fetch fresh data from the API"),
+]
+
+
+def _search_filters(
+    property_type: str,
+    transaction_type: str,
+    budget_min: Optional[int],
+    budget_max: Optional[int],
+    surface_min: Optional[int],
+    surface_max: Optional[int],
+    price_per_meter_min: Optional[int],
+    price_per_meter_max: Optional[int],
+    bedroom_min: Optional[int],
+    zip_codes: Optional[list[str]],
+    order_by: Optional[str],
+) -> dict:
+    """Map the shared tool filter arguments to _search_melo_properties kwargs."""
+    return {
+        "property_type": _PROPERTY_TYPES[property_type],
+        "transaction_type": _TRANSACTION_TYPES[transaction_type],
+        "budget_min": budget_min,
+        "budget_max": budget_max,
+        "surface_min": surface_min,
+        "surface_max": surface_max,
+        "price_per_meter_min": price_per_meter_min,
+        "price_per_meter_max": price_per_meter_max,
+        "bedroom_min": bedroom_min,
+        "included_zipcodes": zip_codes,
+        "order_by": order_by,
+    }
 
 
 @mcp.tool(
@@ -151,61 +524,33 @@ async def _search_melo_properties(
     description="Search for real estate properties using the Melo API with comprehensive filtering options",
 )
 async def search_properties(
-    property_type: Literal["apartment", "house"] = Field(
-        default="apartment",
-        description="Type of property: 'apartment' or 'house'",
-    ),
-    transaction_type: Literal["sell", "rent"] = Field(
-        default="sell",
-        description="Transaction type: 'sell' for purchase or 'rent' for rental",
-    ),
-    budget_min: Optional[int] = Field(
-        default=None,
-        description="Minimum budget/price in euros",
-    ),
-    budget_max: Optional[int] = Field(
-        default=None,
-        description="Maximum budget/price in euros",
-    ),
-    surface_min: Optional[int] = Field(
-        default=None,
-        description="Minimum surface area in square meters",
-    ),
-    surface_max: Optional[int] = Field(
-        default=None,
-        description="Maximum surface area in square meters",
-    ),
-    price_per_meter_min: Optional[int] = Field(
-        default=None,
-        description="Minimum price per square meter in euros",
-    ),
-    price_per_meter_max: Optional[int] = Field(
-        default=None,
-        description="Maximum price per square meter in euros",
-    ),
-    bedroom_min: Optional[int] = Field(
-        default=None,
-        description="Minimum number of bedrooms",
-    ),
-    zip_codes: Optional[list[str]] = Field(
-        default=None,
-        description="List of zip codes to search in (e.g., ['75011', '23158'])",
-    ),
-    order_by: Optional[Literal["pricePerMeter", "price", "updatedAt"]] = Field(
-        default=None,
-        description="Sort results by: 'pricePerMeter', 'price', or 'updatedAt'",
-    ),
-    items_per_page: int = Field(
-        default=5,
-        ge=1,
-        le=10,
-        description="Number of results per page (1-10)",
-    ),
-    page: int = Field(
-        default=1,
-        ge=1,
-        description="Page number for pagination",
-    ),
+    property_type: _PropertyTypeParam = "apartment",
+    transaction_type: _TransactionTypeParam = "sell",
+    budget_min: _BudgetMinParam = None,
+    budget_max: _BudgetMaxParam = None,
+    surface_min: _SurfaceMinParam = None,
+    surface_max: _SurfaceMaxParam = None,
+    price_per_meter_min: _PricePerMeterMinParam = None,
+    price_per_meter_max: _PricePerMeterMaxParam = None,
+    bedroom_min: _BedroomMinParam = None,
+    zip_codes: _ZipCodesParam = None,
+    order_by: _OrderByParam = None,
+    items_per_page: Annotated[
+        int,
+        Field(
+            ge=0,
+            le=10,
+            description="Number of results per page (1-10), or 0 to only return the total number of matching properties",
+        ),
+    ] = 5,
+    page: Annotated[
+        int,
+        Field(
+            ge=1,
+            description="Page number for pagination",
+        ),
+    ] = 1,
+    cache_bypass: _CacheBypassParam = False,
 ) -> dict:
     """
     Search for real estate properties in France using the Melo API. Requires X-API-KEY header with a valid Melo API key.
@@ -219,39 +564,130 @@ async def search_properties(
       property_type="apartment", transaction_type="sell", bedroom_min=2, zip_codes=["75001", "75002"]
     - Find houses for rent under 2000€:
       property_type="house", transaction_type="rent", budget_max=2000
+    - Count apartments for sale in Paris 11th without fetching them:
+      property_type="apartment", zip_codes=["75011"], items_per_page=0
     """
 
-    # Extract API key from request headers using get_http_headers()
-    headers = get_http_headers()
-    api_key = headers.get("x-api-key")
-
-    if not api_key:
-        logger.error("❌ Missing X-API-KEY header")
-        raise ValueError("Missing X-API-KEY header. Please provide your Melo API key.")
-
-    logger.info("🔑 Using API key from request headers")
-
-    # Map user-friendly values to API values
-    property_type_map = {"apartment": 0, "house": 1}
-    transaction_type_map = {"sell": 0, "rent": 1}
+    api_key = _require_api_key()
+    filters = _search_filters(
+        property_type,
+        transaction_type,
+        budget_min,
+        budget_max,
+        surface_min,
+        surface_max,
+        price_per_meter_min,
+        price_per_meter_max,
+        bedroom_min,
+        zip_codes,
+        order_by,
+    )
 
     return await _search_melo_properties(
         api_key=api_key,
-        property_type=property_type_map[property_type],
-        transaction_type=transaction_type_map[transaction_type],
-        budget_min=budget_min,
-        budget_max=budget_max,
-        surface_min=surface_min,
-        surface_max=surface_max,
-        price_per_meter_min=price_per_meter_min,
-        price_per_meter_max=price_per_meter_max,
-        bedroom_min=bedroom_min,
-        included_zipcodes=zip_codes,
-        order_by=order_by,
+        **filters,
         items_per_page=items_per_page,
         page=page,
+        cache_bypass=cache_bypass,
     )
 
 
+@mcp.tool(
+    title="Search Properties (Multiple Pages)",
+    description="Search for real estate properties using the Melo API, fetching several result pages at once",
+)
+async def search_properties_batch(
+    property_type: _PropertyTypeParam = "apartment",
+    transaction_type: _TransactionTypeParam = "sell",
+    budget_min: _BudgetMinParam = None,
+    budget_max: _BudgetMaxParam = None,
+    surface_min: _SurfaceMinParam = None,
+    surface_max: _SurfaceMaxParam = None,
+    price_per_meter_min: _PricePerMeterMinParam = None,
+    price_per_meter_max: _PricePerMeterMaxParam = None,
+    bedroom_min: _BedroomMinParam = None,
+    zip_codes: _ZipCodesParam = None,
+    order_by: _OrderByParam = None,
+    items_per_page: Annotated[
+        int,
+        Field(
+            ge=1,
+            le=10,
+            description="Number of results per page (1-10)",
+        ),
+    ] = 5,
+    pages: Annotated[
+        int,
+        Field(
+            ge=1,
+            le=10,
+            description="Number of consecutive result pages to fetch, starting at page 1 (1-10)",
+        ),
+    ] = 3,
+    cache_bypass: _CacheBypassParam = False,
+) -> dict:
+    """
+    Search for real estate properties in France using the Melo API, fetching several pages concurrently. Requires X-API-KEY header with a valid Melo API key.
+
+    Use this instead of repeated search_properties calls when more results are needed
+    than a single page holds. Pages 1 to `pages` are requested in parallel and their
+    properties are merged, in page order, into a single `hydra:member` list.
+
+    Example usage:
+    - Get the 30 cheapest apartments for sale in Paris 11th:
+      property_type="apartment", zip_codes=["75011"], order_by="price", items_per_page=10, pages=3
+    """
+
+    api_key = _require_api_key()
+    filters = _search_filters(
+        property_type,
+        transaction_type,
+        budget_min,
+        budget_max,
+        surface_min,
+        surface_max,
+        price_per_meter_min,
+        price_per_meter_max,
+        bedroom_min,
+        zip_codes,
+        order_by,
+    )
+
+    results = await asyncio.gather(
+        *(
+            _search_melo_properties(
+                api_key=api_key,
+                **filters,
+                items_per_page=items_per_page,
+                page=page,
+                cache_bypass=cache_bypass,
+            )
+            for page in range(1, pages + 1)
+        )
+    )
+
+    return {
+        "hydra:member": [
+            item for result in results for item in result.get("hydra:member", [])
+        ],
+        "hydra:totalItems": results[0].get("hydra:totalItems"),
+    }
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format=_LOG_FORMAT)
+    logger.info("🔓 MCP Server initialized (pass-through authentication)")
+
+    try:
+        await mcp.run_async(transport="streamable-http")
+    finally:
+        await _close_clients()
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    if sys.platform == "win32":
+        asyncio.run(main())
+    else:
+        import uvloop
+
+        uvloop.run(main())